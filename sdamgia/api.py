@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import io
 import logging
 import re
+import threading
 import unicodedata
 from collections.abc import Callable
+from contextvars import ContextVar
 from types import TracebackType
 from typing import Any, Literal
 from urllib.parse import urljoin
@@ -14,33 +17,109 @@ import aiohttp
 from cairosvg import svg2png
 from PIL import Image
 from PIL.Image import Image as ImageType
-from selectolax.parser import HTMLParser, Node
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 
 from .enums import GiaType, Subject
 from .types import BASE_DOMAIN, Catalog, Category, Problem, ProblemPart, Topic
 from .utils import base_url
 
+# images with urls that may be relative to base url
+_RELATIVE_IMG_SELECTOR = f'img[src]:not([src*="{BASE_DOMAIN}"]):not([src^="data:"])'
+
+_ID_PARAM_RE = re.compile(r"id=(\d+)")
+
+# problem id link inside of `span.prob_nums`
+_PROBLEM_ID_LINK_RE = re.compile(
+    r'class="prob_nums"[^>]*>(?:(?!</span>).)*?<a\b[^>]*>\s*(\d+)\s*</a>', re.DOTALL
+)
+
+# topic id with its number, and topic name, e.g. "Задания Д13. Планиметрия"
+_TOPIC_NAME_RE = re.compile(r"([^.]*?(\d+)[^.]*)\.\s*(.*?)\s*$", re.DOTALL)
+
+# (client, gia type, subject, base url) overwritten for the current method call
+_params_override: ContextVar[tuple[Any, GiaType, Subject, str] | None] = ContextVar(
+    "params_override", default=None
+)
+
 
 def _handle_params(method: Callable[..., Any]) -> Callable[..., Any]:
-    """Handle `gia_type` and `subject` params."""
+    """Handle `gia_type` and `subject` params.
+
+    Overwritten params are stored in a context variable instead of client attributes,
+    so concurrent calls on the same client do not affect each other.
+    """
 
     async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
-        save_gia_type = self.gia_type
-        save_subject = self.subject
+        if (gia_type := kwargs.pop("gia_type", None)) is None:
+            gia_type = self.gia_type
+        if (subject := kwargs.pop("subject", None)) is None:
+            subject = self.subject
 
-        if (gia_type := kwargs.pop("gia_type", None)) is not None:
-            self.gia_type = gia_type
-        if (subject := kwargs.pop("subject", None)) is not None:
-            self.subject = subject
+        token = _params_override.set(
+            (self, gia_type, subject, base_url(gia_type=gia_type, subject=subject))
+        )
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            _params_override.reset(token)
 
-        result = await method(self, *args, **kwargs)
+    return wrapper
 
-        self.gia_type = save_gia_type
-        self.subject = save_subject
 
-        return result
+def _latex_ocr_input(model: Any, image: ImageType) -> Any:
+    """Preprocess image into LaTeX OCR model input tensor the same way `LatexOCR` does."""
+    import numpy as np
+    import torch
+    from pix2tex.cli import minmax_size
+    from pix2tex.dataset.transforms import test_transform
+    from pix2tex.utils import pad
+
+    args = model.args
+
+    def _to_tensor(img: ImageType) -> Any:
+        return test_transform(image=np.array(img.convert("RGB")))["image"][:1].unsqueeze(0)
+
+    image = minmax_size(pad(image), args.max_dimensions, args.min_dimensions)
+    if model.image_resizer is None or args.no_resize:
+        return _to_tensor(pad(image))
+
+    # find the image width the model was trained on with the resizer network
+    input_image = image.convert("RGB")
+    ratio, width, height = 1.0, input_image.size[0], input_image.size[1]
+    with torch.no_grad():
+        for _ in range(10):
+            height = int(height * ratio)
+            resample = Image.Resampling.BILINEAR if ratio > 1 else Image.Resampling.LANCZOS
+            image = pad(
+                minmax_size(
+                    input_image.resize((width, height), resample),
+                    args.max_dimensions,
+                    args.min_dimensions,
+                )
+            )
+            tensor = _to_tensor(image)
+            width = (model.image_resizer(tensor.to(args.device)).argmax(-1).item() + 1) * 32
+            if width == image.size[0]:
+                break
+            ratio = width / image.size[0]
+    return tensor
 
-    return wrapper
+
+def _image_hash(image: ImageType) -> str:
+    """Hash image content, so identical images get the same key."""
+    digest = hashlib.sha1(image.tobytes(), usedforsecurity=False)
+    digest.update(f"{image.mode}{image.size}".encode())
+    return digest.hexdigest()
+
+
+def _optimize_latex_ocr_model(model: Any) -> None:
+    """Cast LaTeX OCR model to bfloat16 if possible and compile its decoder network."""
+    import torch
+
+    if model.args.device == "cuda" and torch.cuda.is_bf16_supported():
+        model.model = model.model.to(torch.bfloat16)
+    # decoded sequence grows every step, so the graph is compiled with dynamic shapes
+    model.model.decoder.net = torch.compile(model.model.decoder.net, dynamic=True)
 
 
 class SdamgiaAPI:
@@ -55,6 +134,14 @@ class SdamgiaAPI:
         gia_type: The GIA type to use in methods if unspecified.
         subject: The subject to use in methods if unspecified.
         session: An aiohttp client session to use for requests.
+        latex_batch_size: The maximum number of images recognized by LaTeX OCR at once.
+        optimize_latex_ocr: Whether to compile LaTeX OCR decoder with `torch.compile`
+            and run the model in bfloat16 when it is supported by the device.
+        max_concurrent_requests: The maximum number of requests sent at the same time.
+            Paginated methods also prefetch this many pages at once.
+
+    Raises:
+        ValueError: If `latex_batch_size` or `max_concurrent_requests` is less than 1.
     """
 
     def __init__(
@@ -63,16 +150,73 @@ class SdamgiaAPI:
         subject: Subject = Subject.MATH,
         *,
         session: aiohttp.ClientSession | None = None,
+        latex_batch_size: int = 16,
+        optimize_latex_ocr: bool = False,
+        max_concurrent_requests: int = 8,
     ):
-        self.gia_type = gia_type
-        self.subject = subject
-        self._session = session or aiohttp.ClientSession()
+        if latex_batch_size < 1:
+            raise ValueError("'latex_batch_size' must be at least 1")
+        if max_concurrent_requests < 1:
+            raise ValueError("'max_concurrent_requests' must be at least 1")
+
+        self._gia_type = gia_type
+        self._subject = subject
+        self._base_url = base_url(gia_type=gia_type, subject=subject)
+        self._session = session or aiohttp.ClientSession(
+            # keep connections alive between the many small requests made per problem
+            connector=aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=20,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            ),
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
         self._latex_ocr_model = None
+        self._latex_ocr_lock = threading.Lock()
+        self._png_cache: dict[str, bytes] = {}
+        self._latex_cache: dict[str, str] = {}
+        self._topics_count_cache: dict[tuple[GiaType, Subject], int] = {}
+        self._latex_batch_size = latex_batch_size
+        self._optimize_latex_ocr = optimize_latex_ocr
+        self._max_concurrent_requests = max_concurrent_requests
+        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
+
+    def _get_params_override(self) -> tuple[Any, GiaType, Subject, str] | None:
+        if (override := _params_override.get()) is not None and override[0] is self:
+            return override
+        return None
+
+    @property
+    def gia_type(self) -> GiaType:
+        """GIA type currently used in methods."""
+        if (override := self._get_params_override()) is not None:
+            return override[1]
+        return self._gia_type
+
+    @gia_type.setter
+    def gia_type(self, value: GiaType) -> None:
+        self._gia_type = value
+        self._base_url = base_url(gia_type=value, subject=self._subject)
+
+    @property
+    def subject(self) -> Subject:
+        """Subject currently used in methods."""
+        if (override := self._get_params_override()) is not None:
+            return override[2]
+        return self._subject
+
+    @subject.setter
+    def subject(self, value: Subject) -> None:
+        self._subject = value
+        self._base_url = base_url(gia_type=self._gia_type, subject=value)
 
     @property
     def base_url(self) -> str:
         """Get base site url for currently used GIA type and subject."""
-        return base_url(gia_type=self.gia_type, subject=self.subject)
+        if (override := self._get_params_override()) is not None:
+            return override[3]
+        return self._base_url
 
     @_handle_params
     async def get_problem(
@@ -90,45 +234,50 @@ class SdamgiaAPI:
         Returns:
             The problem fetched.
         """
-        parser = HTMLParser(await self._get(f"/problem?id={problem_id}"))
+        parser = LexborHTMLParser(await self._get(f"/problem?id={problem_id}"))
 
         if (problem_node := parser.css_first(".prob_maindiv")) is None:
             raise RuntimeError("Problem node not found")
 
         # make all image urls absolute
-        for img_node in problem_node.css("img"):
-            if BASE_DOMAIN not in (url := str(img_node.attributes["src"])):
-                img_node.attributes["src"] = urljoin(self.base_url, url)
+        for img_node in problem_node.css(_RELATIVE_IMG_SELECTOR):
+            url = str(img_node.attributes["src"])
+            if url.startswith("/") and not url.startswith("//"):
+                url = self.base_url + url
+            else:
+                url = urljoin(self.base_url, url)
+            img_node.attrs["src"] = url  # type: ignore[index]
 
         try:
-            topic_id = int(problem_node.css_first("span.prob_nums").text().split()[1])
+            prob_nums_node = problem_node.css_first("span.prob_nums")
+            topic_id = int(prob_nums_node.text().split()[1])  # type: ignore[union-attr]
         except (IndexError, AttributeError, ValueError):
             topic_id = None
 
+        body_nodes = problem_node.css("div.pbody")
+
         try:
-            condition_node = parser.css_first("div.pbody")
-            condition = await self._get_problem_part(condition_node, recognize_text=recognize_text)
+            condition = await self._get_problem_part(body_nodes[0], recognize_text=recognize_text)
         except (IndexError, AttributeError):
             condition = None
 
         try:
-            solution_node = (
-                problem_node.css_first("div.solution") or problem_node.css("div.pbody")[1]
-            )
+            solution_node = problem_node.css_first("div.solution") or body_nodes[1]
             solution = await self._get_problem_part(solution_node, recognize_text=recognize_text)
         except (IndexError, AttributeError):
             solution = None
 
         try:
-            answer = problem_node.css_first("div.answer").text().lstrip("Ответ:").strip()
+            answer_node = problem_node.css_first("div.answer")
+            answer = answer_node.text().lstrip("Ответ:").strip()  # type: ignore[union-attr]
         except (IndexError, AttributeError):
             answer = ""
 
-        analog_urls = [
-            str(link.attributes["href"]) for link in problem_node.css_first("div.minor").css("a")
-        ]
+        minor_node = problem_node.css_first("div.minor")
         analog_ids = [
-            int(mo.group(1)) for url in analog_urls if (mo := re.search(r"id=(\d+)", url))
+            int(mo.group(1))
+            for link in minor_node.css("a")  # type: ignore[union-attr]
+            if (mo := _ID_PARAM_RE.search(str(link.attributes["href"])))
         ]
 
         return Problem(
@@ -176,8 +325,7 @@ class SdamgiaAPI:
         Returns:
             A list of IDs of problem included in the test.
         """
-        parser = HTMLParser(await self._get(f"/test?id={test_id}"))
-        return self._get_problem_ids(parser)
+        return self._get_problem_ids(await self._get(f"/test?id={test_id}"))
 
     @_handle_params
     async def get_catalog(self) -> Catalog:
@@ -186,25 +334,27 @@ class SdamgiaAPI:
         Returns:
             A list of topics containing included categories.
         """
-        parser = HTMLParser(await self._get("/prob_catalog"))
-        topics = [c for c in parser.css("div.cat_category") if c.attributes.get("data-id") is None]
-        topics = topics[1:]  # skip header
+        # catalog page is large, so it is parsed from raw bytes without decoding it first
+        parser = LexborHTMLParser(await self._get_bytes("/prob_catalog"))  # type: ignore[arg-type]
+        topics = parser.css("div.cat_category:not([data-id])")[1:]  # skip header
 
         catalog = []
         for topic in topics:
-            topic_id_str, topic_name = topic.css_first("b.cat_name").text().split(".", maxsplit=1)
-            topic_name = topic_name.strip()
+            topic_name_node = topic.css_first("b.cat_name")
+            mo = _TOPIC_NAME_RE.match(topic_name_node.text())  # type: ignore[union-attr]
+            topic_id_str, topic_number_str, topic_name = mo.groups()  # type: ignore[union-attr]
             is_additional = "д" in topic_id_str.lower()
-            topic_number = int(re.search(r"\d+", topic_id_str).group())  # type: ignore[union-attr]
+            topic_number = int(topic_number_str)
+            children_node = topic.css_first("div.cat_children")
             categories = [
                 Category(
                     id=int(str(cat_node.attributes.get("data-id", -1))),
-                    name=cat_node.css_first("a.cat_name").text(),
-                    problems_count=int(cat_node.css_first("div.cat_count").text()),
+                    name=cat_node.css_first("a.cat_name").text(),  # type: ignore[union-attr]
+                    problems_count=int(cat_node.css_first("div.cat_count").text()),  # type: ignore[union-attr]
                     gia_type=self.gia_type,
                     subject=self.subject,
                 )
-                for cat_node in topic.css_first("div.cat_children").css("div.cat_category")
+                for cat_node in children_node.css("div.cat_category")  # type: ignore[union-attr]
             ]
 
             catalog.append(
@@ -240,18 +390,16 @@ class SdamgiaAPI:
             problems = {"full": 1}
 
         if total := problems.get("full"):
-            params = {f"prob{i + 1}": total for i in range(len(await self.get_catalog()))}
+            key = (self.gia_type, self.subject)
+            if (topics_count := self._topics_count_cache.get(key)) is None:
+                topics_count = len(await self.get_catalog())
+                self._topics_count_cache[key] = topics_count
+            params = {f"prob{i + 1}": total for i in range(topics_count)}
         else:
             params = {f"prob{i}": problems[i] for i in problems}
 
-        path = (
-            await self._session.get(
-                f"{self.base_url}/test?a=generate",
-                params=params,
-                allow_redirects=False,
-            )
-        ).headers["location"]
-        return int(re.search(r"id=(\d+)", path).group(1))  # type: ignore[union-attr]
+        path = await self._get_redirect_location("/test?a=generate", params=params)
+        return int(_ID_PARAM_RE.search(path).group(1))  # type: ignore[union-attr]
 
     @_handle_params
     async def generate_pdf(
@@ -311,14 +459,7 @@ class SdamgiaAPI:
             if not value:
                 del params[key]
 
-        return urljoin(
-            self.base_url,
-            (
-                await self._session.get(
-                    f"{self.base_url}/test", params=params, allow_redirects=False
-                )
-            ).headers["location"],
-        )
+        return urljoin(self.base_url, await self._get_redirect_location("/test", params=params))
 
     async def close(self) -> None:
         """Close current session."""
@@ -337,66 +478,218 @@ class SdamgiaAPI:
 
     async def _get(self, path: str = "", url: str = "", **kwargs: Any) -> str:
         """Get html from full `url` or `path` relative to base url."""
-        url = url or urljoin(self.base_url, path)
-        async with self._session.request(method="GET", url=url, **kwargs) as response:
+        url = url or self.base_url + path
+        async with (
+            self._semaphore,
+            self._session.request(method="GET", url=url, **kwargs) as response,
+        ):
             logging.debug(f"Sent GET request: {response.status}: {response.url}")
             response.raise_for_status()
             return await response.text()
 
+    async def _get_bytes(self, path: str = "", url: str = "", **kwargs: Any) -> bytes:
+        """Get raw response body from full `url` or `path` relative to base url."""
+        url = url or self.base_url + path
+        async with (
+            self._semaphore,
+            self._session.request(method="GET", url=url, **kwargs) as response,
+        ):
+            logging.debug(f"Sent GET request: {response.status}: {response.url}")
+            response.raise_for_status()
+            return await response.read()
+
+    async def _get_redirect_location(self, path: str, params: dict[str, Any]) -> str:
+        """Get redirect location for `path` relative to base url without reading the body."""
+        async with (
+            self._semaphore,
+            self._session.get(
+                self.base_url + path, params=params, allow_redirects=False
+            ) as response,
+        ):
+            logging.debug(f"Sent GET request: {response.status}: {response.url}")
+            return response.headers["location"]
+
     async def _fetch_svg(self, url: str) -> ImageType:
-        byte_string = await self._get(url=url)
-        png_bytes = svg2png(bytestring=byte_string)
+        if (png_bytes := self._png_cache.get(url)) is None:
+            svg_bytes = await self._get_bytes(url=url)
+            png_bytes = svg2png(bytestring=svg_bytes)
+            self._png_cache[url] = png_bytes
         buffer = io.BytesIO(png_bytes)
         return Image.open(buffer)
 
-    def _recognize_image_text(self, image: ImageType) -> str:
+    def _get_latex_ocr_model(self) -> Any:
         if self._latex_ocr_model is None:
             try:
                 from pix2tex.cli import LatexOCR
 
-                self._latex_ocr_model = LatexOCR()
+                model = LatexOCR()
             except ImportError:
                 raise RuntimeError("'pix2tex' is required for this functional but not found")
-        return f"${self._latex_ocr_model(image)}$"  # type: ignore[misc]
+            if self._optimize_latex_ocr:
+                _optimize_latex_ocr_model(model)
+            self._latex_ocr_model = model
+        return self._latex_ocr_model
+
+    async def _recognize_urls_text(self, urls: list[str]) -> list[str]:
+        """Recognize images by their urls, while the rest of them are still downloading."""
+        if not urls:
+            return []
+        # pix2tex changes process working directory while loading the model, so it is
+        # loaded here blocking the loop instead of concurrently with other coroutines
+        self._get_latex_ocr_model()
+
+        queue: asyncio.Queue[tuple[int, ImageType | BaseException]] = asyncio.Queue()
+
+        async def _download(i: int, url: str) -> None:
+            try:
+                await queue.put((i, await self._fetch_svg(url)))
+            except Exception as e:
+                await queue.put((i, e))
+
+        downloads = [asyncio.create_task(_download(i, url)) for i, url in enumerate(urls)]
+        result = [""] * len(urls)
+        try:
+            received = 0
+            while received < len(urls):
+                # take all images downloaded so far, waiting only for the first one
+                batch = [await queue.get()]
+                while len(batch) < self._latex_batch_size and not queue.empty():
+                    batch.append(queue.get_nowait())
+                received += len(batch)
+
+                images = []
+                for _, image in batch:
+                    if isinstance(image, BaseException):
+                        raise image
+                    images.append(image)
+                texts = await asyncio.to_thread(self._recognize_images_text, images)
+                for (i, _), text in zip(batch, texts):
+                    result[i] = text
+        finally:
+            for task in downloads:
+                task.cancel()
+        return result
 
-    async def _get_problem_part(self, node: Node, recognize_text: bool = False) -> ProblemPart:
-        image_nodes = node.css("img.tex")
-        image_urls = [str(img_node.attributes["src"]) for img_node in image_nodes]
+    def _recognize_images_text(self, images: list[ImageType]) -> list[str]:
+        # runs in a worker thread, so concurrent calls must not share the model at once
+        with self._latex_ocr_lock:
+            # the same formula images are shared between many problems
+            keys = [_image_hash(image) for image in images]
+            unknown = {
+                key: image for key, image in zip(keys, images) if key not in self._latex_cache
+            }
+            if unknown:
+                texts = self._run_latex_ocr(list(unknown.values()))
+                self._latex_cache.update(zip(unknown, texts))
+            return [self._latex_cache[key] for key in keys]
+
+    def _run_latex_ocr(self, images: list[ImageType]) -> list[str]:
+        model = self._get_latex_ocr_model()
+
+        import torch
+        from pix2tex.utils import post_process, token2str
+
+        tensors = [_latex_ocr_input(model, image) for image in images]
+
+        # only images of the same size after preprocessing can be stacked into one batch
+        buckets: dict[tuple[int, ...], list[int]] = {}
+        for i, tensor in enumerate(tensors):
+            buckets.setdefault(tuple(tensor.shape), []).append(i)
+
+        dtype = next(model.model.parameters()).dtype
+        result = [""] * len(images)
+        with torch.no_grad():
+            for indices in buckets.values():
+                for start in range(0, len(indices), self._latex_batch_size):
+                    batch_indices = indices[start : start + self._latex_batch_size]
+                    batch = torch.cat([tensors[i] for i in batch_indices]).to(
+                        model.args.device, dtype=dtype
+                    )
+                    tokens = model.model.generate(
+                        batch, temperature=model.args.get("temperature", 0.25)
+                    )
+                    # rows that finished earlier keep sampling tokens after EOS
+                    after_eos = torch.cumsum(tokens == model.args.eos_token, dim=1) > 0
+                    tokens = tokens.masked_fill(after_eos, model.args.pad_token)
+                    for i, text in zip(batch_indices, token2str(tokens, model.tokenizer)):
+                        result[i] = f"${post_process(text)}$"
+        return result
+
+    async def _get_problem_part(
+        self, node: LexborNode, recognize_text: bool = False
+    ) -> ProblemPart:
+        image_nodes: list[LexborNode] = []
+        image_urls: list[str] = []
+        other_image_urls: list[str] = []
+        for img_node in node.css("img[src]"):
+            url = str(img_node.attributes["src"])
+            if "tex" in str(img_node.attributes.get("class") or "").split():
+                image_nodes.append(img_node)
+                image_urls.append(url)
+            else:
+                other_image_urls.append(url)
 
         if recognize_text:
-            images = await asyncio.gather(
-                *[asyncio.create_task(self._fetch_svg(url)) for url in image_urls]
-            )
+            # the same formula may appear several times in one problem part
+            unique_urls = list(dict.fromkeys(image_urls))
+            image_texts = dict(zip(unique_urls, await self._recognize_urls_text(unique_urls)))
 
-            for img_node, image in zip(image_nodes, images):
-                img_node.replace_with(self._recognize_image_text(image))
+            for img_node, url in zip(image_nodes, image_urls):
+                img_node.replace_with(image_texts[url])
 
             text = node.text(strip=True, deep=True)
         else:
             text = node.text(deep=True)
-        text = unicodedata.normalize("NFKC", text).replace("\xad", "")
+        text = text.replace("\xad", "")
+        if not text.isascii():
+            text = unicodedata.normalize("NFKC", text)
 
-        for img_node in node.css("img"):
-            if (url := str(img_node.attributes["src"])) not in image_urls:
+        for url in other_image_urls:
+            if url not in image_urls:
                 image_urls.append(url)
 
         return ProblemPart(text=text, html=str(node.html), image_urls=image_urls)
 
     @staticmethod
-    def _get_problem_ids(node: Node | HTMLParser) -> list[int]:
-        return [int(node.css_first("a").text()) for node in node.css("span.prob_nums")]
+    def _get_problem_ids(html: str) -> list[int]:
+        if "prob_nums" not in html:
+            return []
+        # avoid building the whole tree just for ids, unless some of them have other markup
+        ids = _PROBLEM_ID_LINK_RE.findall(html)
+        if len(ids) == html.count("prob_nums"):
+            return [int(id) for id in ids]
+        parser = LexborHTMLParser(html)
+        return [
+            int(node.css_first("a").text())  # type: ignore[union-attr]
+            for node in parser.css("span.prob_nums")
+        ]
+
+    async def _get_problem_ids_page(self, path: str, params: dict[str, Any]) -> list[int]:
+        return self._get_problem_ids(await self._get(path, params=params))
 
     async def _get_problem_ids_pagination(self, path: str, params: dict[str, Any]) -> list[int]:
         result: list[int] = []
+        seen_ids: set[int] = set()
         page = 1
         while True:
-            params |= {"page": page}
-            parser = HTMLParser(await self._get(path, params=params))
-            if not (ids := self._get_problem_ids(parser)):
-                return result
-            for id in ids:
-                # to prevent bug when site infinitely returns last results page
-                if id in result:
+            # fetch a window of pages concurrently, pages after the first empty one are ignored
+            pages = await asyncio.gather(
+                *[
+                    self._get_problem_ids_page(path, params=params | {"page": page + i})
+                    for i in range(self._max_concurrent_requests)
+                ],
+                return_exceptions=True,
+            )
+            for ids in pages:
+                # errors of pages after the last one do not matter
+                if isinstance(ids, BaseException):
+                    raise ids
+                if not ids:
                     return result
-                result.append(id)
-            page += 1
+                for id in ids:
+                    # to prevent bug when site infinitely returns last results page
+                    if id in seen_ids:
+                        return result
+                    seen_ids.add(id)
+                    result.append(id)
+            page += self._max_concurrent_requests